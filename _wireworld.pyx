@@ -0,0 +1,85 @@
+# cython: language_level=3
+"""
+Ahead-of-time compiled Wireworld kernel, used by main.step_wireworld when built.
+Mirrors the Numba kernel in main.py; build with `python setup.py build_ext --inplace`.
+"""
+cimport cython
+from libc.stdint cimport int8_t
+
+# Integer state codes, matching main.py
+cdef enum:
+    EMPTY = 0
+    HEAD = 1
+    TAIL = 2
+    CONDUCTOR = 3
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline void _step_border_cell(const int8_t[:, ::1] grid, int8_t[:, ::1] out,
+                                   Py_ssize_t x, Py_ssize_t y, Py_ssize_t h, Py_ssize_t w) noexcept nogil:
+    cdef int8_t cell = grid[x, y]
+    cdef int heads = 0
+    cdef Py_ssize_t nx, ny
+    if cell == HEAD:
+        out[x, y] = TAIL
+    elif cell == TAIL:
+        out[x, y] = CONDUCTOR
+    elif cell == CONDUCTOR:
+        for nx in range(x - 1, x + 2):
+            for ny in range(y - 1, y + 2):
+                if (nx != x or ny != y) and 0 <= nx < h and 0 <= ny < w and grid[nx, ny] == HEAD:
+                    heads += 1
+        if heads == 1 or heads == 2:
+            out[x, y] = HEAD
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def step(const int8_t[:, ::1] grid, int8_t[:, ::1] out, Py_ssize_t tile=64):
+    """
+    Advances `grid` by one generation into `out`, which must start as a copy
+    of `grid`; cells that keep their state are not written. Raises ValueError
+    when the shapes differ or `tile` is below 1, since the loops below run
+    without bounds checks.
+    """
+    cdef Py_ssize_t h = grid.shape[0]
+    cdef Py_ssize_t w = grid.shape[1]
+    cdef Py_ssize_t bx, by, x0, y0, x, y, n_bx, n_by
+    cdef int8_t cell
+    cdef int heads
+    if out.shape[0] != h or out.shape[1] != w:
+        raise ValueError(f"out has shape ({out.shape[0]}, {out.shape[1]}), expected ({h}, {w})")
+    if tile < 1:
+        raise ValueError(f"tile must be at least 1, got {tile}")
+    if h == 0 or w == 0:
+        return  # The border loops below assume at least one row and column
+    n_bx = (h - 2 + tile - 1) // tile
+    n_by = (w - 2 + tile - 1) // tile
+    with nogil:
+        # Interior cells: all 8 neighbors exist, so no bounds checks are needed
+        for bx in range(n_bx):
+            x0 = 1 + bx * tile
+            for by in range(n_by):
+                y0 = 1 + by * tile
+                for x in range(x0, min(x0 + tile, h - 1)):
+                    for y in range(y0, min(y0 + tile, w - 1)):
+                        cell = grid[x, y]
+                        if cell == HEAD:
+                            out[x, y] = TAIL
+                        elif cell == TAIL:
+                            out[x, y] = CONDUCTOR
+                        elif cell == CONDUCTOR:
+                            heads = ((grid[x - 1, y - 1] == HEAD) + (grid[x - 1, y] == HEAD) +
+                                     (grid[x - 1, y + 1] == HEAD) + (grid[x, y - 1] == HEAD) +
+                                     (grid[x, y + 1] == HEAD) + (grid[x + 1, y - 1] == HEAD) +
+                                     (grid[x + 1, y] == HEAD) + (grid[x + 1, y + 1] == HEAD))
+                            if heads == 1 or heads == 2:
+                                out[x, y] = HEAD
+        # Border rows and columns
+        for y in range(w):
+            _step_border_cell(grid, out, 0, y, h, w)
+            _step_border_cell(grid, out, h - 1, y, h, w)
+        for x in range(1, h - 1):
+            _step_border_cell(grid, out, x, 0, h, w)
+            _step_border_cell(grid, out, x, w - 1, h, w)
@@ -1,16 +1,199 @@
 import yaml
-import copy
 import time
 import numpy as np
 from typing import List, Optional
 
-from rich.console import Console
-from rich.table import Table
+from rich.console import Console, Group
+from rich.live import Live
 from rich.panel import Panel
+from rich.text import Span, Text
+
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional; step_wireworld falls back to NumPy
+    njit = None
+
+try:
+    import _wireworld  # Optional compiled kernel, see setup.py
+except ImportError:
+    _wireworld = None
+
+
+# --- Vectorized Wireworld Kernel ---
+# Integer state codes: 0: empty, 1: electron head, 2: electron tail, 3: conductor
+EMPTY, HEAD, TAIL, CONDUCTOR = 0, 1, 2, 3
+STATE_TO_INT = {'_': EMPTY, 'H': HEAD, 'T': TAIL, 'W': CONDUCTOR}
+INT_TO_STATE = {value: alias for alias, value in STATE_TO_INT.items()}
+# Alias for each code, indexable by a whole int8 grid at once
+STATE_ALIASES = np.array([INT_TO_STATE[code] for code in range(len(INT_TO_STATE))])
+# ASCII byte -> state code; -1 marks characters that are not state aliases
+ASCII_TO_STATE = np.full(256, -1, dtype=np.int8)
+ASCII_TO_STATE[[ord(alias) for alias in STATE_TO_INT]] = list(STATE_TO_INT.values())
+
+
+def grid_from_strings(rows: List[str]) -> np.ndarray:
+    """
+    Builds an int8 state grid from equal-length rows of state aliases with a
+    single buffer copy and one lookup-table index, without per-cell Python work.
+    Raises ValueError for no rows, ragged rows, or unknown characters.
+    """
+    if not rows:
+        raise ValueError("Initial grid must have at least one row.")
+    if any(len(row) != len(rows[0]) for row in rows):
+        raise ValueError("Initial grid rows must all have the same length.")
+    raw = np.frombuffer(''.join(rows).encode('ascii', errors='replace'), dtype=np.uint8)
+    grid = ASCII_TO_STATE[raw.reshape(len(rows), -1)]
+    if (grid < 0).any():
+        unknown = sorted(set(''.join(rows)) - set(STATE_TO_INT))
+        raise ValueError(f"Unknown state aliases in initial grid: {unknown}")
+    return grid
+
+
+# (dx, dy) offsets of the 8 Moore neighbors
+MOORE_OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+# LUT[state, head count] -> new state for the classic Wireworld rules; a rule
+# set fusing to this table can be stepped by step_wireworld()
+WIREWORLD_LUT = np.array([[EMPTY] * 9,
+                          [TAIL] * 9,
+                          [CONDUCTOR] * 9,
+                          [CONDUCTOR, HEAD, HEAD] + [CONDUCTOR] * 6], dtype=np.int8)
+
+# Tile edge length for the compiled kernels; a 64x64 int8 tile plus its halo fits in L1
+TILE = 64
+
+
+def _sum_neighbors(padded: np.ndarray) -> np.ndarray:
+    """Sums the 8 shifted views of a zero-padded mask into per-cell neighbor counts."""
+    return (padded[:-2, :-2] + padded[:-2, 1:-1] + padded[:-2, 2:] +
+            padded[1:-1, :-2] + padded[1:-1, 2:] +
+            padded[2:, :-2] + padded[2:, 1:-1] + padded[2:, 2:])
+
+
+def neighborhood_keys(padded: np.ndarray) -> np.ndarray:
+    """
+    Packs each cell's 3x3 neighborhood into one integer, 3 bits per cell in
+    row-major order. `padded` is the grid inside a one-cell -1 border (see
+    Rule.pad); codes are stored offset by one so that border packs as 0.
+    """
+    h, w = padded.shape[0] - 2, padded.shape[1] - 2
+    padded = padded.astype(np.int32) + 1
+    keys = np.zeros((h, w), dtype=np.int32)
+    for dx in range(3):
+        for dy in range(3):
+            keys = (keys << 3) | padded[dx:dx + h, dy:dy + w]
+    return keys
+
+
+def decode_neighborhood(key: int) -> np.ndarray:
+    """Inverse of neighborhood_keys() for a single key: returns the 3x3 int8 region."""
+    cells = [(key >> (3 * (8 - i))) & 7 for i in range(9)]
+    return (np.array(cells, dtype=np.int8) - 1).reshape(3, 3)
+
+
+def _step_wireworld_numpy(grid: np.ndarray) -> np.ndarray:
+    """
+    Advances an integer-coded Wireworld grid by one generation using whole-array
+    operations instead of per-cell Python loops.
+    """
+    heads = _sum_neighbors(np.pad((grid == HEAD).astype(np.int8), 1))
+    new_grid = grid.copy()
+    new_grid[grid == HEAD] = TAIL
+    new_grid[grid == TAIL] = CONDUCTOR
+    new_grid[(grid == CONDUCTOR) & ((heads == 1) | (heads == 2))] = HEAD
+    return new_grid
+
+
+if njit is not None:
+    @njit(cache=True, boundscheck=False)
+    def _step_border_cell(grid, out, x, y, h, w):
+        cell = grid[x, y]
+        if cell == HEAD:
+            out[x, y] = TAIL
+        elif cell == TAIL:
+            out[x, y] = CONDUCTOR
+        elif cell == CONDUCTOR:
+            heads = 0
+            for nx in range(x - 1, x + 2):
+                for ny in range(y - 1, y + 2):
+                    if (nx != x or ny != y) and 0 <= nx < h and 0 <= ny < w and grid[nx, ny] == HEAD:
+                        heads += 1
+            if heads == 1 or heads == 2:
+                out[x, y] = HEAD
+
+    # The first call compiles the kernel and its thread pool setup, which takes
+    # a few seconds; cache=True stores the machine code in __pycache__ so later
+    # runs only pay a cache load.
+    @njit(parallel=True, cache=True, boundscheck=False)
+    def _step_ww(grid, out, tile):
+        h, w = grid.shape
+        # The loops below run without bounds checks
+        if out.shape[0] != h or out.shape[1] != w:
+            raise ValueError("out must have the same shape as grid")
+        if tile < 1:
+            raise ValueError("tile must be at least 1")
+        # Interior cells: all 8 neighbors exist, so no bounds checks are needed.
+        # Bands of `tile` rows run in parallel; within a band, tiles are walked
+        # in order so each block's rows stay in L1. `out` is preallocated by the
+        # caller as a copy of `grid`, so nothing is allocated inside the parallel
+        # region and cells that keep their state (empty cells, conductors
+        # without 1 or 2 head neighbors) are never written.
+        n_bands = (h - 2 + tile - 1) // tile
+        for band in prange(n_bands):
+            x0 = 1 + band * tile
+            for y0 in range(1, w - 1, tile):
+                for x in range(x0, min(x0 + tile, h - 1)):
+                    for y in range(y0, min(y0 + tile, w - 1)):
+                        cell = grid[x, y]
+                        if cell == HEAD:
+                            out[x, y] = TAIL
+                        elif cell == TAIL:
+                            out[x, y] = CONDUCTOR
+                        elif cell == CONDUCTOR:
+                            heads = ((grid[x - 1, y - 1] == HEAD) + (grid[x - 1, y] == HEAD) +
+                                     (grid[x - 1, y + 1] == HEAD) + (grid[x, y - 1] == HEAD) +
+                                     (grid[x, y + 1] == HEAD) + (grid[x + 1, y - 1] == HEAD) +
+                                     (grid[x + 1, y] == HEAD) + (grid[x + 1, y + 1] == HEAD))
+                            if heads == 1 or heads == 2:
+                                out[x, y] = HEAD
+        # Border rows and columns
+        for y in range(w):
+            _step_border_cell(grid, out, 0, y, h, w)
+            _step_border_cell(grid, out, h - 1, y, h, w)
+        for x in range(1, h - 1):
+            _step_border_cell(grid, out, x, 0, h, w)
+            _step_border_cell(grid, out, x, w - 1, h, w)
+else:
+    _step_ww = None
+
+
+def step_wireworld(grid: np.ndarray, tile: int = TILE) -> np.ndarray:
+    """
+    Advances an integer-coded Wireworld grid by one generation. Prefers the
+    ahead-of-time compiled extension, then the Numba kernel, then NumPy.
+    `tile` sets the compiled kernels' block size; the NumPy path is untiled.
+    """
+    if tile < 1:
+        raise ValueError(f"tile must be at least 1, got {tile}")
+    grid = np.ascontiguousarray(grid, dtype=np.int8)
+    if grid.size == 0:
+        # The kernels' border loops assume at least one row and column
+        return grid.copy()
+    if _wireworld is None and _step_ww is None:
+        return _step_wireworld_numpy(grid)
+    out = grid.copy()
+    if _wireworld is not None:
+        _wireworld.step(grid, out, tile)
+    else:
+        _step_ww(grid, out, tile)
+    return out
 
 
 # --- Rule and Loader Classes ---
 class Rule:
+    # Sentinel used to pad grids; it never equals a pattern state or a counted state
+    OFF_GRID = -1
+
     def __init__(self, name, description, pattern, new_state, conditions=None):
         self.name = name
         self.description = description
@@ -18,55 +201,73 @@ class Rule:
         self.new_state = new_state
         self.conditions = conditions or []
 
-    def _count_neighbors(self, grid, x, y, state_to_count):
-        """Helper method to count neighbors of a specific state."""
-        count = 0
-        h, w = grid.shape
-        for dx in range(-1, 2):
-            for dy in range(-1, 2):
-                if dx == 0 and dy == 0:
-                    continue
-                
-                px, py = x + dx, y + dy
-                if 0 <= px < h and 0 <= py < w and grid[px, py] == state_to_count:
-                    count += 1
-        return count
-
-    def matches(self, grid, x, y):
+        # Precompiled pattern plus a mask of its non-wildcard cells
+        self.pattern_vals = self.compile_pattern(pattern)
+        self.pattern_mask = self.pattern_vals != self.OFF_GRID
+        self.new_code = STATE_TO_INT[new_state]
+        # Each neighbor_count condition becomes (state code, bitmask of allowed counts)
+        self.count_checks = [
+            (STATE_TO_INT[cond['state']], sum(1 << v for v in cond['values'] if isinstance(v, int)))
+            for cond in self.conditions if cond['type'] == 'neighbor_count'
+        ]
+        self._check = self._compile_conditions(self.count_checks)
+
+    @staticmethod
+    def compile_pattern(pattern) -> np.ndarray:
+        """
+        Converts a pattern given as rows of aliases ('X' for the wildcard) into
+        a contiguous, read-only 3x3 int8 array with OFF_GRID for wildcards.
+        An int8 array is taken as already compiled. Raises ValueError for any
+        other shape, which matches() would otherwise broadcast.
+        """
+        if isinstance(pattern, np.ndarray) and pattern.dtype == np.int8:
+            compiled = np.array(pattern, order='C')
+        else:
+            compiled = np.array(
+                [[Rule.OFF_GRID if cell == 'X' else STATE_TO_INT[cell] for cell in row] for row in pattern],
+                dtype=np.int8)
+        if compiled.shape != (3, 3):
+            raise ValueError(f"Rule pattern must be 3x3, got shape {compiled.shape}")
+        compiled.setflags(write=False)
+        return compiled
+
+    @staticmethod
+    def _compile_conditions(count_checks):
+        """
+        Turns the condition list into one closure over a 3x3 region, so matches()
+        does no per-cell dispatch on condition dicts.
+        """
+        if not count_checks:
+            return lambda region: True
+
+        def count_ok(region, state, allowed):
+            neighbor_count = np.count_nonzero(region == state) - (region[1, 1] == state)
+            return (allowed >> int(neighbor_count)) & 1
+
+        if len(count_checks) == 1:
+            (state, allowed), = count_checks
+            return lambda region: count_ok(region, state, allowed)
+        return lambda region: all(count_ok(region, state, allowed) for state, allowed in count_checks)
+
+    @staticmethod
+    def pad(grid):
+        """Surrounds an int grid with a one-cell OFF_GRID border, as expected by matches()."""
+        return np.pad(grid, 1, constant_values=Rule.OFF_GRID)
+
+    def matches(self, padded, x, y):
         """
         Checks if a rule applies by verifying both the 3x3 pattern
-        and all additional conditions.
+        and all additional conditions. `padded` is the grid wrapped by pad(),
+        while (x, y) are coordinates in the unpadded grid.
         """
-        # --- 1. Check the full 3x3 pattern ---
-        h, w = grid.shape
-        for dx in range(-1, 2):
-            for dy in range(-1, 2):
-                pattern_cell = self.pattern[dx + 1][dy + 1]
-                if pattern_cell == 'X':  # Wildcard matches anything
-                    continue
-
-                px, py = x + dx, y + dy
-                # If pattern requires a state but we are off-grid, it's not a match
-                if not (0 <= px < h and 0 <= py < w):
-                    return False
-                
-                # If the grid cell doesn't match the specific state in the pattern
-                if grid[px, py] != pattern_cell:
-                    return False
-
-        # --- 2. If pattern matched, check all conditions ---
-        for cond in self.conditions:
-            if cond['type'] == 'neighbor_count':
-                state_to_check = cond['state']
-                required_counts = cond['values']
-                
-                neighbor_count = self._count_neighbors(grid, x, y, state_to_check)
-                
-                if neighbor_count not in required_counts:
-                    return False  # A condition was not met
-
-        # If both the pattern and all conditions pass, the rule is a match.
-        return True
+        region = padded[x:x + 3, y:y + 3]
+
+        # --- 1. Check the full 3x3 pattern; off-grid cells never match a state ---
+        if np.any(self.pattern_mask & (region != self.pattern_vals)):
+            return False
+
+        # --- 2. If pattern matched, the rule matches when all conditions pass ---
+        return bool(self._check(region))
 
 class RuleSet:
     def __init__(self, rules, states):
@@ -74,17 +275,62 @@ class RuleSet:
         self.states = states
         self.state_alias_to_value = {alias: value for alias, value in states.items()}
         self.state_value_to_alias = {value: alias for alias, value in states.items()}
+        self.counted_state, self.lut = self._build_lut()
+        # Classic Wireworld rule sets run on the dedicated kernels
+        self.is_wireworld = self.counted_state == HEAD and np.array_equal(self.lut, WIREWORLD_LUT)
+        # Memo of packed 3x3 neighborhood -> next state, for rule sets without a LUT
+        self._cache = {}
+
+    def apply(self, padded, x, y):
+        """Returns the code of the first rule matching at (x, y), or the current code."""
+        for rule in self.rules:
+            if rule.matches(padded, x, y):
+                return rule.new_code
+        # If no rule matches, the state remains unchanged (e.g., empty cells)
+        return padded[x + 1, y + 1]
+
+    def next_state(self, key):
+        """
+        Memoized rule walk keyed on a packed neighborhood from neighborhood_keys().
+        Most cells share a handful of neighborhoods, so nearly every call is a hit.
+        """
+        new_state = self._cache.get(key)
+        if new_state is None:
+            new_state = self.apply(decode_neighborhood(key), 0, 0)
+            self._cache[key] = new_state
+        return new_state
+
+    def _build_lut(self):
+        """
+        Fuses all rules into a transition table LUT[state, count] -> new state,
+        where count is the number of neighbors in a single counted state.
+        Returns (counted_state, lut), or (None, None) when some rule looks at
+        more than the center cell and that one neighbor count.
+        """
+        counted = {state for rule in self.rules for state, _ in rule.count_checks}
+        off_center = np.ones((3, 3), dtype=bool)
+        off_center[1, 1] = False
+        if len(counted) > 1 or any(np.any(rule.pattern_mask & off_center) for rule in self.rules):
+            return None, None
+        counted_state = counted.pop() if counted else HEAD
+        filler = EMPTY if counted_state != EMPTY else Rule.OFF_GRID
+
+        lut = np.zeros((len(STATE_TO_INT), 9), dtype=np.int8)
+        for state in range(len(STATE_TO_INT)):
+            for count in range(9):
+                # Synthesize a neighborhood with `count` counted-state neighbors
+                cells = [counted_state] * count + [filler] * (8 - count)
+                stub = np.array(cells[:4] + [state] + cells[4:], dtype=np.int8).reshape(3, 3)
+                lut[state, count] = self.apply(Rule.pad(stub), 1, 1)
+        return counted_state, lut
 
     @staticmethod
     def from_yaml(path):
         def parse_when(when_str):
-            lines = [line.strip() for line in when_str.strip().splitlines() 
+            lines = [line.strip() for line in when_str.strip().splitlines()
                      if line.strip()]
-            pattern = []
-            for line in lines:
-                row = [cell for cell in line.split()]
-                pattern.append(row)
-            return pattern
+            # Materialize the pattern as an int8 array once, at load time
+            return Rule.compile_pattern([line.split() for line in lines])
 
         with open(path, 'r') as f:
             data = yaml.safe_load(f)
@@ -104,105 +350,227 @@ class RuleSet:
 
 
 class Grid:
-    def __init__(self, width: int, height: int, initial: Optional[List[List[str]]] = None, log_file=None, enable_logging=False):
+    def __init__(self, width: int, height: int, initial: Optional[List[str]] = None, log_file=None, enable_logging=False):
+        """
+        `initial` holds one row per entry, either as a string of state aliases
+        or as a list of single-character aliases.
+        """
         self.width = width
         self.height = height
         self.enable_logging = enable_logging
         self.turn = 0
-        if initial[0][0] and isinstance(initial[0][0], str) and len(initial[0][0]) == 1:
-            self.grid = np.array(initial, dtype=str)
+        if initial is not None:
+            # Convert aliases to int codes once; the simulation only ever sees int8
+            cells = grid_from_strings([''.join(row) for row in initial])
         else:
-            self.grid = np.full((height, width), '_', dtype=str)  # Default to '_'
-
-        # assert that the first cell is a char of len 1
-        msg = "Initial grid must be a 2D list of single-character strings."
-        print(f"Initial grid: {initial}")
-        print("first cell", initial[0][0], len(initial[0][0]), type(initial[0][0]))
-        assert initial[0][0] and isinstance(initial[0][0], str) and len(initial[0][0]) == 1, msg
+            cells = np.full((height, width), EMPTY, dtype=np.int8)  # Default to '_'
+        # Cells live inside a permanent one-cell OFF_GRID border that is never
+        # written, so neighbor lookups need no bounds checks or per-step padding
+        self._padded = Rule.pad(cells)
 
+        # Flat indexes of the only cells that can change on the next fused step
+        # and the rule set they were derived for; None means every cell
+        self._active = None
+        self._active_rules = None
 
         # Initialize log file if logging is enabled
         if self.enable_logging:
-            self.log_file = open('game.log', 'w') if not log_file else log_file
+            # A large buffer lets a step's batched lines go out in few syscalls
+            self.log_file = open('game.log', 'w', buffering=1 << 20) if not log_file else log_file
         else:
             self.log_file = None
 
+    @property
+    def grid(self) -> np.ndarray:
+        """
+        The int8 state grid, as a read-only view inside the dead border. Edits
+        go through the setter or __setitem__, which invalidate the frontier.
+        """
+        view = self._padded[1:-1, 1:-1]
+        view.flags.writeable = False
+        return view
+
+    @grid.setter
+    def grid(self, value):
+        self._padded[1:-1, 1:-1] = value
+        self._active = None  # An outside edit can wake any cell
+
     def __getitem__(self, idx):
         return self.grid[idx]
 
     def __setitem__(self, idx, value):
-        self.grid[idx] = value
+        self._padded[1:-1, 1:-1][idx] = value
+        self._active = None  # An outside edit can wake any cell
 
     def step(self, rule_set: RuleSet):
+        if rule_set.lut is not None:
+            xs, ys, new_vals = self._step_fused(rule_set)
+        else:
+            # Memoized path: walk the rules once per distinct neighborhood
+            keys, inverse = np.unique(neighborhood_keys(self._padded), return_inverse=True)
+            next_states = np.array([rule_set.next_state(int(key)) for key in keys], dtype=np.int8)
+            new_grid = next_states[inverse].reshape(self.grid.shape)
+            xs, ys = np.nonzero(new_grid != self.grid)
+            new_vals = new_grid[xs, ys]
+            self._active = None
+        self._advance(xs, ys, new_vals)
+
+    def advance_to(self, new_grid: np.ndarray):
+        """
+        Advances one turn to an already known next grid, such as a replayed
+        frame of a cycle, counting and logging it exactly like step().
+        """
+        self._active = None  # The frontier belongs to the last computed step
+        new_grid = np.asarray(new_grid, dtype=np.int8)
+        xs, ys = np.nonzero(new_grid != self.grid)
+        self._advance(xs, ys, new_grid[xs, ys])
+
+    def _advance(self, xs: np.ndarray, ys: np.ndarray, new_vals: np.ndarray):
+        """Ends a turn by writing only the changed cells, given in row-major order."""
         self.turn += 1
         if self.enable_logging:
-            self.log_file.write(f"--- Step {self.turn} ---\n")
-            self.log_file.write(f"--- Applying rules for next step ---\n")
-        
-        new_grid = self.grid.copy()
-        for x in range(self.height):
-            for y in range(self.width):
-                new_state = self.calculate_next_cell_state(x, y, rule_set)
-                new_grid[x, y] = new_state
-                
-                if self.enable_logging:
-                    # Log the state change, if a rule was applied
-                    current_state = self.grid[x, y]
-                    if new_state != current_state:
-                        log_entry = f"Cell ({x}, {y}): Changed from '{current_state}' to '{new_state}'.\n"
-                        self.log_file.write(log_entry)
-
-        self.grid = new_grid
-
-    def calculate_next_cell_state(self, x: int, y: int, rule_set: RuleSet) -> str:
+            self._log_changes(xs, ys, new_vals)
+
+        self._padded[xs + 1, ys + 1] = new_vals
+
+    def _log_changes(self, xs: np.ndarray, ys: np.ndarray, new_vals: np.ndarray):
+        """Writes this step's header and every changed cell in one batched write."""
+        before = STATE_ALIASES[self.grid[xs, ys]].tolist()
+        after = STATE_ALIASES[new_vals].tolist()
+        entries = [f"--- Step {self.turn} ---\n", "--- Applying rules for next step ---\n"]
+        entries += [f"Cell ({x}, {y}): Changed from '{old}' to '{new}'.\n"
+                    for x, y, old, new in zip(xs.tolist(), ys.tolist(), before, after)]
+        self.log_file.writelines(entries)
+
+    def _step_fused(self, rule_set: RuleSet):
+        """
+        Applies the rule set's transition table and returns the changed cells
+        as (xs, ys, new values). A cell's next state depends only on its own
+        state and its neighbor count, so a cell can change only if it or one of
+        its neighbors changed on the previous step. Only that active frontier
+        is recomputed, so a step costs O(frontier) rather than O(H*W). The
+        whole grid is recomputed on the first step, after outside edits, or
+        when the frontier is too large to pay off, using step_wireworld() when
+        the table is the classic Wireworld one.
+        """
+        grid = self.grid
+        h, w = grid.shape
+        active = self._active if self._active_rules is rule_set else None
+        padded, counted = self._padded, rule_set.counted_state
+        if active is None or len(active) > grid.size // 4:
+            if rule_set.is_wireworld:
+                new_grid = step_wireworld(grid)
+            else:
+                counts = _sum_neighbors((padded == counted).astype(np.int8))
+                new_grid = rule_set.lut[grid, counts]
+            xs, ys = np.nonzero(new_grid != grid)
+            new_vals = new_grid[xs, ys]
+        else:
+            xs, ys = np.divmod(active, w)
+            # The dead border keeps every neighbor index in range
+            counts = np.zeros(len(active), dtype=np.int8)
+            for dx, dy in MOORE_OFFSETS:
+                counts += padded[xs + 1 + dx, ys + 1 + dy] == counted
+            new_vals = rule_set.lut[grid[xs, ys], counts]
+            changed = new_vals != grid[xs, ys]
+            xs, ys, new_vals = xs[changed], ys[changed], new_vals[changed]
+
+        # Next frontier: the changed cells and their neighbors
+        nx = (xs[:, None] + np.array([0] + [dx for dx, _ in MOORE_OFFSETS])).ravel()
+        ny = (ys[:, None] + np.array([0] + [dy for _, dy in MOORE_OFFSETS])).ravel()
+        inside = (nx >= 0) & (nx < h) & (ny >= 0) & (ny < w)
+        self._active = np.unique(nx[inside] * w + ny[inside])
+        self._active_rules = rule_set
+        return xs, ys, new_vals
+
+    def calculate_next_cell_state(self, x: int, y: int, rule_set: RuleSet, padded=None) -> str:
         """
         Calculates the next state of a single cell based on Wireworld rules.
         This function encapsulates the core logic for state transitions.
+        `padded` defaults to the grid with its dead border.
         """
-        current_state = self.grid[x, y]
-        
-        # Iterate through rules to find the first match
-        for rule in rule_set.rules:
-            if rule.matches(self.grid, x, y):
-                return rule.new_state
-        
-        # If no rule matches, the state remains unchanged (e.g., empty cells)
-        return current_state
+        if padded is None:
+            padded = self._padded
+        return INT_TO_STATE[rule_set.apply(padded, x, y)]
 
     def as_list(self):
-        return self.grid.tolist()
+        """Returns the grid as nested lists of state aliases."""
+        return STATE_ALIASES[self.grid].tolist()
 
 
 class UI:
+    # Character and style for each int state code:
+    #   0 '_': Empty
+    #   1 'H': Electron Head (red)
+    #   2 'T': Electron Tail (blue)
+    #   3 'W': Conductor Wire (yellow)
+    INT_TO_CHAR = np.array(['.', 'H', 'T', 'W'], dtype=object)
+    INT_TO_STYLE = np.array(['grey50', 'bold red', 'blue', 'yellow'], dtype=object)
+    CELL_SEPARATOR = '  '
+
     def __init__(self, console=None):
         self.console = console or Console()
-        # states:
-        #   _: Empty
-        #   H: Electron Head (red)
-        #   T: Electron Tail (blue)
-        #   W: Conductor Wire (yellow)
-        self.state_alias_to_repr = {
-            '_': '[grey].[/]',      # Empty
-            'H': '[bold red]H[/]',  # Electron head
-            'T': '[blue]T[/]',      # Electron tail
-            'W': '[yellow]W[/]'     # Conductor
-        }
+        self._live = None
+        self._prev = None   # Grid codes shown in the previous frame
+        self._rows = []     # Rendered Text for each grid row, reused across frames
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        if self._live is None:
+            self._live = Live(console=self.console, auto_refresh=False)
+            self._live.start()
+
+    def stop(self):
+        if self._live is not None:
+            self._live.stop()
+            self._live = None
+
+    def _render_row(self, row) -> Text:
+        """
+        Builds a row's Text by indexing the char and style tables with the int
+        row, emitting one style span per run of equal cells.
+        """
+        separator = self.CELL_SEPARATOR
+        stride = len(separator) + 1
+        plain = separator.join(self.INT_TO_CHAR[row])
+        bounds = [0, *(np.flatnonzero(np.diff(row)) + 1).tolist(), len(row)]
+        styles = self.INT_TO_STYLE[row[bounds[:-1]]] if len(row) else []
+        spans = [Span(start * stride, (end - 1) * stride + 1, style)
+                 for start, end, style in zip(bounds, bounds[1:], styles)]
+        return Text(plain, no_wrap=True, spans=spans)
 
     def draw(self, grid: Grid, step: int):
-        self.console.clear()
-        self.console.print(Panel(f"[bold green]Wireworld Step {step}[/]", expand=False))
-        table = Table(show_header=False, box=None, pad_edge=False)
-        for _ in range(grid.width):
-            table.add_column(justify="center", no_wrap=True)
-        for row in grid.as_list():
-            visuals = [self.state_alias_to_repr.get(cell, '?') for cell in row]
-            table.add_row(*visuals)
-        self.console.print(table)
-        self.console.print
+        """
+        Redraws the grid in place with Rich Live; call it inside `with ui:`.
+        Each row's Text is cached and rebuilt only when one of its cells
+        changed since the previous frame, but Live still repaints every row.
+        """
+        if self._live is None:
+            raise RuntimeError("UI.draw() must be called inside a `with ui:` block")
+        cells = grid.grid
+        if self._prev is None or self._prev.shape != cells.shape:
+            self._rows = [self._render_row(row) for row in cells]
+        else:
+            for x in np.flatnonzero((cells != self._prev).any(axis=1)):
+                self._rows[x] = self._render_row(cells[x])
+        self._prev = cells.copy()
+
+        header = Panel(f"[bold green]Wireworld Step {step}[/]", expand=False)
+        self._live.update(Group(header, *self._rows), refresh=True)
 
 
 class App:
-    def __init__(self):
+    def __init__(self, grid: Optional[Grid] = None, ui: Optional[UI] = None,
+                 rule_set: Optional[RuleSet] = None, steps: int = 15, time_delay: float = 0.3):
+        """
+        Runs the demo circuit unless a grid, UI or rule set is passed in.
+        """
         # 0: empty, 1: electron head, 2: electron tail, 3: conductor
         # Simple wire with an electron head
         # Empty grey "."
@@ -222,22 +590,46 @@ class App:
             "__________"   # 10
         ]
 
-        initial = [list(row) for row in initial_str]
-        initial = np.array(initial)
-        # initial[1][1] = 'T'  # Electron tail
-        # initial[1][2] = 'H'  # Electron head
-        self.grid = Grid(10, 10, initial, enable_logging=True)
-        self.ui = UI()
-        self.rule_set = RuleSet.from_yaml('wire-world.yaml')
-        self.steps = 15
+        self.grid = grid if grid is not None else Grid(10, 10, initial_str, enable_logging=True)
+        self.ui = ui if ui is not None else UI()
+        self.rule_set = rule_set if rule_set is not None else RuleSet.from_yaml('wire-world.yaml')
+        self.steps = steps
+        # Bytes of past frames kept for cycle detection; past this, run() just steps
+        self.max_history_bytes = 64 << 20
 
-        self.time_delay = 0.3
+        self.time_delay = time_delay
 
     def run(self):
-        for i in range(self.steps):
-            self.ui.draw(self.grid, i)
-            self.grid.step(self.rule_set)
-            time.sleep(self.time_delay)
+        # The simulation is deterministic, so once a grid repeats the run is
+        # periodic: keep every frame until the first repeat, then replay the
+        # cycle instead of stepping. Recording stops once the frames would
+        # exceed max_history_bytes, and the run falls back to plain steps.
+        seen = {}           # hash of grid bytes -> index into frames
+        frames = []         # grid at each step, until the cycle is found
+        recording = True
+        cycle_start = None
+        with self.ui:
+            for i in range(self.steps):
+                if recording:
+                    cells = self.grid.grid
+                    key = hash(cells.tobytes())
+                    first = seen.get(key)
+                    if first is not None and np.array_equal(frames[first], cells):
+                        cycle_start = first
+                        recording = False
+                    elif (len(frames) + 1) * cells.nbytes > self.max_history_bytes:
+                        seen, frames, recording = {}, [], False
+                    else:
+                        seen[key] = len(frames)
+                        frames.append(cells.copy())
+
+                self.ui.draw(self.grid, i)
+                if cycle_start is None:
+                    self.grid.step(self.rule_set)
+                else:
+                    period = len(frames) - cycle_start
+                    self.grid.advance_to(frames[cycle_start + (i + 1 - cycle_start) % period])
+                time.sleep(self.time_delay)
 
 
 def main():
@@ -0,0 +1,27 @@
+"""
+Builds the optional compiled Wireworld kernel:
+
+    python setup.py build_ext --inplace
+
+Cython is only needed for that build (see requirements-optional.txt); without
+it no extension is built and main.py falls back to Numba or NumPy.
+"""
+from setuptools import setup, Extension
+
+try:
+    from Cython.Build import cythonize
+except ImportError:  # Cython is optional; skip the extension
+    cythonize = None
+
+extensions = [
+    Extension(
+        "_wireworld",
+        ["_wireworld.pyx"],
+        extra_compile_args=["-O3", "-march=native", "-ftree-vectorize"],
+    )
+]
+
+setup(
+    name="wire_world_engine",
+    ext_modules=cythonize(extensions) if cythonize is not None else [],
+)
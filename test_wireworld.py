@@ -1,7 +1,10 @@
+import io
 import pytest
 import numpy as np
-from main import RuleSet, Grid, Rule
+import main
+from main import App, RuleSet, Grid, Rule, UI, grid_from_strings, step_wireworld, _step_wireworld_numpy
 import yaml
+from rich.console import Console
 from typing import List, Optional
 
 def load_yaml_rules(file_path: str) -> RuleSet:
@@ -32,19 +35,19 @@ def grid_from_string(grid_str: str, rule_set: RuleSet) -> List[List[str]]:
 
 def test_calculate_next_cell_state_empty_remains_empty(rule_set):
     grid_data = [
-        ['.', '.', '.'],
-        ['.', '.', '.'],
-        ['.', '.', '.']
+        ['_', '_', '_'],
+        ['_', '_', '_'],
+        ['_', '_', '_']
     ]
     grid_obj = Grid(3, 3, initial=grid_data)
     next_state = grid_obj.calculate_next_cell_state(1, 1, rule_set)
-    assert next_state == '.', f"Expected '.' but got {next_state}"
+    assert next_state == '_', f"Expected '_' but got {next_state}"
 
 def test_calculate_next_cell_state_head_to_tail(rule_set):
     grid_data = [
-        ['.', '.', '.'],
-        ['.', 'H', '.'],
-        ['.', '.', '.']
+        ['_', '_', '_'],
+        ['_', 'H', '_'],
+        ['_', '_', '_']
     ]
     grid_obj = Grid(3, 3, initial=grid_data)
     next_state = grid_obj.calculate_next_cell_state(1, 1, rule_set)
@@ -52,9 +55,9 @@ def test_calculate_next_cell_state_head_to_tail(rule_set):
 
 def test_calculate_next_cell_state_tail_to_conductor(rule_set):
     grid_data = [
-        ['.', '.', '.'],
-        ['.', 'T', '.'],
-        ['.', '.', '.']
+        ['_', '_', '_'],
+        ['_', 'T', '_'],
+        ['_', '_', '_']
     ]
     grid_obj = Grid(3, 3, initial=grid_data)
     next_state = grid_obj.calculate_next_cell_state(1, 1, rule_set)
@@ -62,9 +65,9 @@ def test_calculate_next_cell_state_tail_to_conductor(rule_set):
 
 def test_calculate_next_cell_state_conductor_one_head_neighbor(rule_set):
     grid_data = [
-        ['.', '.', '.'],
-        ['H', 'W', '.'],
-        ['.', '.', '.']
+        ['_', '_', '_'],
+        ['H', 'W', '_'],
+        ['_', '_', '_']
     ]
     grid_obj = Grid(3, 3, initial=grid_data)
     next_state = grid_obj.calculate_next_cell_state(1, 1, rule_set)
@@ -72,9 +75,9 @@ def test_calculate_next_cell_state_conductor_one_head_neighbor(rule_set):
 
 def test_calculate_next_cell_state_conductor_two_head_neighbors(rule_set):
     grid_data = [
-        ['H', '.', '.'],
-        ['.', 'W', '.'],
-        ['H', '.', '.']
+        ['H', '_', '_'],
+        ['_', 'W', '_'],
+        ['H', '_', '_']
     ]
     grid_obj = Grid(3, 3, initial=grid_data)
     next_state = grid_obj.calculate_next_cell_state(1, 1, rule_set)
@@ -82,9 +85,9 @@ def test_calculate_next_cell_state_conductor_two_head_neighbors(rule_set):
 
 def test_calculate_next_cell_state_conductor_zero_head_neighbors(rule_set):
     grid_data = [
-        ['.', '.', '.'],
-        ['.', 'W', '.'],
-        ['.', '.', '.']
+        ['_', '_', '_'],
+        ['_', 'W', '_'],
+        ['_', '_', '_']
     ]
     grid_obj = Grid(3, 3, initial=grid_data)
     next_state = grid_obj.calculate_next_cell_state(1, 1, rule_set)
@@ -93,9 +96,290 @@ def test_calculate_next_cell_state_conductor_zero_head_neighbors(rule_set):
 def test_calculate_next_cell_state_conductor_three_head_neighbors(rule_set):
     grid_data = [
         ['H', 'H', 'H'],
-        ['.', 'W', '.'],
-        ['.', '.', '.']
+        ['_', 'W', '_'],
+        ['_', '_', '_']
     ]
     grid_obj = Grid(3, 3, initial=grid_data)
     next_state = grid_obj.calculate_next_cell_state(1, 1, rule_set)
     assert next_state == 'W', f"Expected 'W' but got {next_state}"
+
+def test_step_wireworld_transitions():
+    grid_data = np.array([
+        [1, 3, 3, 2],
+        [0, 0, 0, 3],
+        [1, 1, 1, 3],
+        [0, 3, 0, 0]
+    ], dtype=np.int8)
+    expected = np.array([
+        [2, 1, 3, 3],
+        [0, 0, 0, 1],
+        [2, 2, 2, 1],
+        [0, 3, 0, 0]
+    ], dtype=np.int8)
+    next_grid = step_wireworld(grid_data)
+    assert next_grid.dtype == np.int8
+    np.testing.assert_array_equal(next_grid, expected)
+
+def test_step_wireworld_matches_rule_engine(rule_set):
+    alias_to_int = {'_': 0, 'H': 1, 'T': 2, 'W': 3}
+    initial_str = [
+        "_WTHWWW_",
+        "_W____W_",
+        "_WHWW_W_",
+        "_W__W_W_",
+        "_WWWWWW_",
+    ]
+    grid_obj = Grid(8, 5, initial=[list(row) for row in initial_str])
+    int_grid = np.array([[alias_to_int[c] for c in row] for row in initial_str], dtype=np.int8)
+    for _ in range(6):
+        grid_obj.step(rule_set)
+        int_grid = step_wireworld(int_grid)
+        expected = np.array([[alias_to_int[c] for c in row] for row in grid_obj.as_list()], dtype=np.int8)
+        np.testing.assert_array_equal(int_grid, expected)
+
+def test_step_wireworld_kernel_matches_numpy():
+    rng = np.random.default_rng(0)
+    grid_data = rng.integers(0, 4, size=(37, 53), dtype=np.int8)
+    for _ in range(5):
+        next_grid = step_wireworld(grid_data)
+        np.testing.assert_array_equal(next_grid, _step_wireworld_numpy(grid_data))
+        grid_data = next_grid
+
+def test_step_wireworld_tile_sizes_match_numpy():
+    rng = np.random.default_rng(1)
+    grid_data = rng.integers(0, 4, size=(70, 45), dtype=np.int8)
+    expected = _step_wireworld_numpy(grid_data)
+    for tile in (1, 7, 16):
+        np.testing.assert_array_equal(step_wireworld(grid_data, tile), expected)
+
+def test_rule_pattern_requires_on_grid_neighbors():
+    rule = Rule('Below Head', '', [['X', 'H', 'X'], ['X', 'W', 'X'], ['X', 'X', 'X']], 'H')
+    grid_data = np.array([
+        [3, 1, 0],
+        [0, 3, 0],
+    ], dtype=np.int8)
+    padded = Rule.pad(grid_data)
+    assert rule.matches(padded, 1, 1)
+    assert not rule.matches(padded, 0, 0), "Off-grid cells must not satisfy a pattern state"
+
+def test_fused_lut_step_matches_per_cell_rules(rule_set):
+    assert rule_set.lut is not None
+    rng = np.random.default_rng(3)
+    grid_data = rng.choice(list('_HTW'), size=(12, 15)).tolist()
+    grid_obj = Grid(15, 12, initial=grid_data)
+    expected = [[grid_obj.calculate_next_cell_state(x, y, rule_set) for y in range(15)] for x in range(12)]
+    grid_obj.step(rule_set)
+    assert grid_obj.as_list() == expected
+
+def test_grid_step_dispatches_wireworld_to_kernel(rule_set, monkeypatch):
+    assert rule_set.is_wireworld
+    calls = []
+    monkeypatch.setattr(main, 'step_wireworld', lambda grid: calls.append(1) or step_wireworld(grid))
+    rng = np.random.default_rng(5)
+    grid_data = rng.choice(list('_HTW'), size=(8, 10)).tolist()
+    grid_obj = Grid(10, 8, initial=grid_data)
+    expected = step_wireworld(grid_obj.grid)
+    grid_obj.step(rule_set)
+    assert calls
+    np.testing.assert_array_equal(grid_obj.grid, expected)
+
+    # Any other table keeps the generic LUT path
+    rules = [Rule('Conductor to Head', '', [['X', 'X', 'X'], ['X', 'W', 'X'], ['X', 'X', 'X']], 'H',
+                  [{'type': 'neighbor_count', 'state': 'H', 'values': [1]}])] + rule_set.rules[1:]
+    custom = RuleSet(rules, rule_set.states)
+    assert custom.lut is not None and not custom.is_wireworld
+    calls.clear()
+    Grid(10, 8, initial=grid_data).step(custom)
+    assert not calls
+
+def test_memoized_step_matches_per_cell_rules(rule_set):
+    # An off-center pattern cannot be fused into the LUT, forcing the memoized path
+    rules = [Rule('Below Head', '', [['X', 'H', 'X'], ['X', 'W', 'X'], ['X', 'X', 'X']], 'H')] + rule_set.rules
+    custom = RuleSet(rules, rule_set.states)
+    assert custom.lut is None
+    rng = np.random.default_rng(4)
+    grid_data = rng.choice(list('_HTW'), size=(9, 11)).tolist()
+    grid_obj = Grid(11, 9, initial=grid_data)
+    expected = [[grid_obj.calculate_next_cell_state(x, y, custom) for y in range(11)] for x in range(9)]
+    grid_obj.step(custom)
+    assert grid_obj.as_list() == expected
+    assert custom._cache
+
+def test_ui_draw_rebuilds_only_changed_rows(rule_set):
+    grid_obj = Grid(4, 3, initial=[list("_HW_"), list("____"), list("_WW_")])
+    ui = UI(Console(file=io.StringIO(), width=40))
+    with ui:
+        ui.draw(grid_obj, 0)
+        first_rows = list(ui._rows)
+        grid_obj.step(rule_set)
+        ui.draw(grid_obj, 1)
+    assert ui._rows[0] is not first_rows[0]
+    assert ui._rows[1] is first_rows[1]
+    assert ui._rows[2] is first_rows[2]
+    assert ui._rows[0].plain == ".  T  H  ."
+
+def test_ui_draw_requires_context_manager():
+    ui = UI(Console(file=io.StringIO()))
+    with pytest.raises(RuntimeError):
+        ui.draw(Grid(3, 1, initial=["_H_"]), 0)
+    assert ui._live is None
+
+def test_grid_accepts_strings_and_char_lists():
+    rows = ["_HT", "W__"]
+    expected = np.array([[0, 1, 2], [3, 0, 0]], dtype=np.int8)
+    np.testing.assert_array_equal(grid_from_strings(rows), expected)
+    np.testing.assert_array_equal(Grid(3, 2, initial=rows).grid, expected)
+    np.testing.assert_array_equal(Grid(3, 2, initial=[list(row) for row in rows]).grid, expected)
+
+@pytest.mark.parametrize("rows", [[], ["WWH", "W", "__"], ["_H.", "___"], ["_H\u00e9"]])
+def test_grid_from_strings_rejects_malformed_rows(rows):
+    with pytest.raises(ValueError):
+        grid_from_strings(rows)
+    with pytest.raises(ValueError):
+        Grid(3, len(rows), initial=rows)
+
+def _set_head(grid_obj, x, y):
+    grid_obj[x, y] = 1
+
+def _set_head_via_setter(grid_obj, x, y):
+    cells = grid_obj.grid.copy()
+    cells[x, y] = 1
+    grid_obj.grid = cells
+
+@pytest.mark.parametrize("edit", [_set_head, _set_head_via_setter])
+def test_active_frontier_step_matches_full_step(rule_set, edit):
+    # A long wire keeps the frontier well under a quarter of the grid
+    rows = ["_" * 40, "_" + "W" * 38 + "_", "_" * 40]
+    rows[1] = rows[1][:3] + "TH" + rows[1][5:]
+    grid_obj = Grid(40, 3, initial=rows)
+    int_grid = grid_obj.grid.copy()
+    for _ in range(30):
+        grid_obj.step(rule_set)
+        int_grid = step_wireworld(int_grid)
+        np.testing.assert_array_equal(grid_obj.grid, int_grid)
+    assert len(grid_obj._active) < grid_obj.grid.size // 4
+
+    # Any outside edit must invalidate the frontier so the new head advances
+    edit(grid_obj, 1, 20)
+    int_grid[1, 20] = 1
+    for _ in range(3):
+        grid_obj.step(rule_set)
+        int_grid = step_wireworld(int_grid)
+        np.testing.assert_array_equal(grid_obj.grid, int_grid)
+
+def test_grid_views_are_read_only():
+    # Writes through a view would bypass the frontier invalidation in __setitem__
+    grid_obj = Grid(3, 2, initial=["_W_", "___"])
+    with pytest.raises(ValueError):
+        grid_obj[0][1] = 1
+    with pytest.raises(ValueError):
+        grid_obj.grid[0, 1] = 1
+    assert grid_obj[0, 1] == 3
+
+def test_rule_patterns_compiled_at_load(rule_set):
+    for rule in rule_set.rules:
+        assert rule.pattern_vals.dtype == np.int8
+        assert rule.pattern_vals.shape == (3, 3)
+        assert rule.pattern_vals.flags.c_contiguous
+        assert not rule.pattern_vals.flags.writeable
+        assert rule.pattern_mask.sum() == 1  # Only the center is constrained
+
+@pytest.mark.parametrize("pattern", [[['X', 'W', 'X']], [['X', 'W'], ['W', 'X'], ['X', 'X']],
+                                     np.zeros((1, 3), dtype=np.int8)])
+def test_rule_rejects_non_3x3_patterns(pattern):
+    with pytest.raises(ValueError):
+        Rule('bad', '', pattern, 'H')
+
+def test_step_logs_changed_cells(rule_set):
+    log = io.StringIO()
+    grid_obj = Grid(4, 1, initial=["THW_"], log_file=log, enable_logging=True)
+    grid_obj.step(rule_set)
+    assert log.getvalue() == (
+        "--- Step 1 ---\n"
+        "--- Applying rules for next step ---\n"
+        "Cell (0, 0): Changed from 'T' to 'W'.\n"
+        "Cell (0, 1): Changed from 'H' to 'T'.\n"
+        "Cell (0, 2): Changed from 'W' to 'H'.\n"
+    )
+
+def test_ui_render_row_styles_each_cell():
+    ui = UI(Console(file=io.StringIO()))
+    text = ui._render_row(np.array([0, 0, 1, 2, 3, 3], dtype=np.int8))
+    assert text.plain == ".  .  H  T  W  W"
+    for y, style in enumerate(['grey50', 'grey50', 'bold red', 'blue', 'yellow', 'yellow']):
+        offset = y * 3
+        assert [span.style for span in text.spans if span.start <= offset < span.end] == [style]
+
+def test_step_wireworld_empty_grid():
+    for shape in ((0, 5), (5, 0), (0, 0)):
+        next_grid = step_wireworld(np.zeros(shape, dtype=np.int8))
+        assert next_grid.shape == shape
+        assert next_grid.dtype == np.int8
+
+def test_compiled_extension_handles_empty_rows():
+    _wireworld = pytest.importorskip("_wireworld")
+    grid_data = np.zeros((0, 5), dtype=np.int8)
+    np.testing.assert_array_equal(step_wireworld(grid_data), grid_data)
+    _wireworld.step(grid_data, grid_data.copy(), 64)  # Called directly, it must not touch memory
+    # A single row still steps through the border path only
+    grid_data = np.array([[3, 1, 3, 2, 3]], dtype=np.int8)
+    out = grid_data.copy()
+    _wireworld.step(grid_data, out, 64)
+    np.testing.assert_array_equal(out, [[1, 2, 1, 3, 3]])
+
+def test_kernels_reject_mismatched_out_and_bad_tile():
+    grid_data = np.ones((200, 200), dtype=np.int8)
+    with pytest.raises(ValueError):
+        step_wireworld(grid_data, 0)
+    kernels = [kernel for kernel in (main._wireworld and main._wireworld.step, main._step_ww) if kernel]
+    if not kernels:
+        pytest.skip("no compiled kernel available")
+    for kernel in kernels:
+        with pytest.raises(ValueError):
+            kernel(grid_data, np.zeros((2, 2), dtype=np.int8), 64)
+        with pytest.raises(ValueError):
+            kernel(grid_data, grid_data.copy(), 0)
+
+def _run_app(rule_set, rows, steps, max_history_bytes=None):
+    """Runs App headless on `rows`, returning it with the drawn frames and computed step count."""
+    grid_obj = Grid(len(rows[0]), len(rows), initial=rows, log_file=io.StringIO(), enable_logging=True)
+    app = App(grid=grid_obj, ui=UI(Console(file=io.StringIO())), rule_set=rule_set, steps=steps, time_delay=0)
+    if max_history_bytes is not None:
+        app.max_history_bytes = max_history_bytes
+
+    drawn = []
+    draw = app.ui.draw
+    app.ui.draw = lambda grid, step: (drawn.append(grid.grid.copy()), draw(grid, step))
+    computed = []
+    grid_step = grid_obj.step
+    grid_obj.step = lambda rule_set: (computed.append(1), grid_step(rule_set))
+    app.run()
+    return app, drawn, len(computed)
+
+def _assert_matches_plain_run(rule_set, rows, app, drawn, steps):
+    reference = Grid(len(rows[0]), len(rows), initial=rows, log_file=io.StringIO(), enable_logging=True)
+    expected = []
+    for _ in range(steps):
+        expected.append(reference.grid.copy())
+        reference.step(rule_set)
+
+    assert len(drawn) == steps
+    for frame, expected_frame in zip(drawn, expected):
+        np.testing.assert_array_equal(frame, expected_frame)
+    np.testing.assert_array_equal(app.grid.grid, reference.grid)
+    assert app.grid.turn == reference.turn == steps
+    assert app.grid.log_file.getvalue() == reference.log_file.getvalue()
+
+# This circuit enters a period-3 cycle after two steps
+CYCLE_ROWS = ["______", "_WWWW_", "_H__W_", "_TWWW_", "______"]
+
+def test_app_run_replays_cycle_with_turns_and_log(rule_set):
+    app, drawn, computed = _run_app(rule_set, CYCLE_ROWS, 12)
+    assert computed < 12, "The cycle should be replayed, not recomputed"
+    _assert_matches_plain_run(rule_set, CYCLE_ROWS, app, drawn, 12)
+
+def test_app_run_steps_plainly_past_history_cap(rule_set):
+    # Room for two frames: the cycle is never seen, so every step is computed
+    app, drawn, computed = _run_app(rule_set, CYCLE_ROWS, 12, max_history_bytes=2 * 30)
+    assert computed == 12
+    _assert_matches_plain_run(rule_set, CYCLE_ROWS, app, drawn, 12)